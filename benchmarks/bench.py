@@ -0,0 +1,287 @@
+# Offline benchmarks for pytoolcore hot paths.
+#   python benchmarks/bench.py run        record the results in benchmarks/baseline.json
+#                                         (with -b, only the selected entries are replaced)
+#   python benchmarks/bench.py compare    compare against benchmarks/baseline.json, exits 1 on regression
+# The committed baseline is only a reference point, re-run 'run' on the machine doing the comparison.
+import argparse
+import ipaddress
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+import typing
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pytoolcore import command  # noqa: E402
+from pytoolcore import engine  # noqa: E402
+from pytoolcore import netutils  # noqa: E402
+from pytoolcore import style  # noqa: E402
+from pytoolcore import utils  # noqa: E402
+
+
+# ----------------------------------------------------------------------------------------------#
+#                                       Generated workloads                                     #
+# ----------------------------------------------------------------------------------------------#
+
+NBOPTIONS: int = 64
+ESCAPEDSIZE: int = 1 << 20
+SEED: int = 0x6578
+BASELINE: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def mkcommand() -> command.Command:
+    nargslist: typing.List[command.Argument] = []
+    for i in range(NBOPTIONS):
+        nargslist.append(command.Argument(argname="--opt{0}".format(i), hasvalue=bool(i % 2),
+                                          optional=True))
+    return command.Command(cmdname="bench", nargslist=nargslist, nbpositionals=2)
+
+
+def mkcmdline() -> str:
+    words: typing.List[str] = ["bench", "first", "second"]
+    for i in range(NBOPTIONS):
+        words.append("--opt{0}".format(i))
+        if i % 2:
+            words.append("value{0}".format(i) * 8)
+    return " ".join(words)
+
+
+def mkengine() -> engine.Engine:
+    eng: engine.Engine = engine.Engine("bench", "benchmark", "pytoolcore")
+    for i in range(NBOPTIONS):
+        eng.addoption("option{0}".format(i), "generated option {0}".format(i), str(i))
+    eng.addcmd(mkcommand(), lambda *args, **kwargs: True, "generated command")
+    for i in range(NBOPTIONS):
+        eng.addcmd(command.Command("cmd{0}".format(i), nbpositionals=1), lambda arg: True,
+                   "generated command {0}".format(i))
+    return eng
+
+
+def mktable() -> typing.List[typing.List[str]]:
+    rand = random.Random(SEED)
+    return [["row{0}".format(i), str(rand.random()), "x" * rand.randint(0, 60)]
+            for i in range(500)]
+
+
+def mkaddrs() -> typing.List[str]:
+    rand = random.Random(SEED)
+    addrs: typing.List[str] = []
+    for i in range(1000):
+        addrs.append("10.{0}.{1}.{2}".format(rand.randint(0, 255), rand.randint(0, 255),
+                                             rand.randint(0, 255)))
+        addrs.append("fe80::{0:x}:{1:x}".format(rand.randint(0, 0xffff), rand.randint(0, 0xffff)))
+        addrs.append("10.0.{0}.0/24".format(i % 256))
+        addrs.append("not-an-address-{0}".format(i))
+    return addrs
+
+
+def mknetworks() -> typing.List[str]:
+    rand = random.Random(SEED)
+    networks: typing.List[str] = []
+    for i in range(2000):
+        prefixlen: int = rand.randint(8, 32)
+        networks.append("10.{0}.{1}.{2}/{3}".format(rand.randint(0, 255), rand.randint(0, 255),
+                                                    rand.randint(0, 255), prefixlen))
+        networks.append("fe80::{0:x}:0/{1}".format(rand.randint(0, 0xffff), rand.randint(96, 128)))
+    return [str(ipaddress.ip_network(net, strict=False)) for net in networks]
+
+
+def mkescaped() -> str:
+    # at least ESCAPEDSIZE characters, half of the chunks being \xhh escapes
+    rand = random.Random(SEED)
+    chunks: typing.List[str] = []
+    size: int = 0
+    while size < ESCAPEDSIZE:
+        if rand.random() < 0.5:
+            chunks.append("\\x{0:02x}".format(rand.randint(0, 255)))
+        else:
+            chunks.append(chr(rand.randint(0x20, 0x7e)))
+        size += len(chunks[-1])
+    return "".join(chunks)
+
+
+# ----------------------------------------------------------------------------------------------#
+#                                           Benchmarks                                          #
+# ----------------------------------------------------------------------------------------------#
+
+def benchparse() -> typing.Callable:
+    cmd: command.Command = mkcommand()
+    cmdline: str = mkcmdline()
+    return lambda: cmd.clone().parse(cmdline)
+
+
+def benchdispatch() -> typing.Callable:
+    eng: engine.Engine = mkengine()
+    cmdline: str = mkcmdline()
+    return lambda: eng(cmdline)
+
+
+def benchcompleter() -> typing.Callable:
+    eng: engine.Engine = mkengine()
+
+    def run() -> None:
+        for text in ("cm", "cmd1", "show o", "help cmd"):
+            state: int = 0
+            try:
+                while True:
+                    eng.completer(text, state)
+                    state += 1
+            except IndexError:
+                pass
+    return run
+
+
+def benchtabulate() -> typing.Callable:
+    table: typing.List[typing.List[str]] = mktable()
+    return lambda: style.Style.tabulate(["Name", "Value", "Description"], table, True)
+
+
+def benchhosts() -> typing.Callable:
+    return lambda: netutils.gethostsfromnetwork("10.0.0.0/16")
+
+
+def benchvalidators() -> typing.Callable:
+    addrs: typing.List[str] = mkaddrs()
+
+    def run() -> None:
+        for addr in addrs:
+            netutils.isipaddr(addr)
+            netutils.isipnetwork(addr)
+    return run
+
+
+def benchaddrset() -> typing.Callable:
+    networks: typing.List[str] = mknetworks()
+    addrs: typing.List[str] = mkaddrs()
+
+    def run() -> None:
+        scope: netutils.AddressSet = netutils.AddressSet(networks)
+        scope.containsmany(addrs)
+        for addr in addrs[:1000]:
+            scope.longestprefix(addr)
+        netutils.gethostsfromnetwork("10.0.0.0/16", scope)
+    return run
+
+
+def benchescape() -> typing.Callable:
+    escaped: str = mkescaped()
+    return lambda: utils.str2bytesnoencoding(escaped)
+
+
+BENCHMARKS: typing.Dict[str, typing.Callable[[], typing.Callable]] = {
+    "command.parse": benchparse,
+    "engine.call": benchdispatch,
+    "engine.completer": benchcompleter,
+    "style.tabulate": benchtabulate,
+    "netutils.gethostsfromnetwork": benchhosts,
+    "netutils.validators": benchvalidators,
+    "netutils.addressset": benchaddrset,
+    "utils.str2bytesnoencoding": benchescape,
+}
+
+
+# ----------------------------------------------------------------------------------------------#
+#                                           Runner                                              #
+# ----------------------------------------------------------------------------------------------#
+
+def measure(name: str, repeat: int, mintime: float) -> typing.Dict[str, typing.Any]:
+    fct: typing.Callable = BENCHMARKS[name]()
+    timer = timeit.Timer(fct)
+    with contextlib.redirect_stdout(io.StringIO()):
+        # calibrate so that a single sample lasts at least mintime
+        number, elapsed = timer.autorange()
+        number = max(1, int(number * mintime / max(elapsed, 1e-9)))
+        samples: typing.List[float] = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return {"best": min(samples), "median": sorted(samples)[len(samples) // 2],
+            "loops": number, "samples": samples}
+
+
+def run(names: typing.List[str], repeat: int, mintime: float) -> typing.Dict[str, typing.Any]:
+    results: typing.Dict[str, typing.Any] = {}
+    for name in names:
+        results[name] = measure(name, repeat, mintime)
+        print("{0:<32} best {1:>12.3f} us  median {2:>12.3f} us".format(
+            name, results[name]["best"] * 1e6, results[name]["median"] * 1e6))
+    return {"python": platform.python_version(), "machine": platform.machine(),
+            "benchmarks": results}
+
+
+def merge(path: str, results: typing.Dict[str, typing.Any]) -> typing.Dict[str, typing.Any]:
+    # keep the entries of the existing baseline for the benchmarks that were not run
+    try:
+        with open(path) as fbaseline:
+            merged: typing.Dict[str, typing.Any] = json.load(fbaseline)["benchmarks"]
+    except (OSError, ValueError, KeyError):
+        merged = {}
+    merged.update(results["benchmarks"])
+    return dict(results, benchmarks=merged)
+
+
+def compare(baseline: typing.Dict[str, typing.Any], current: typing.Dict[str, typing.Any],
+            threshold: float) -> bool:
+    # return False if a benchmark got slower than the baseline by more than threshold
+    ok: bool = True
+    for name, res in current["benchmarks"].items():
+        try:
+            ref: float = baseline["benchmarks"][name]["best"]
+        except KeyError:
+            print("{0:<32} no baseline".format(name))
+            continue
+        ratio: float = res["best"] / ref
+        line: str = "{0:<32} {1:>12.3f} us -> {2:>12.3f} us  x{3:.2f}".format(
+            name, ref * 1e6, res["best"] * 1e6, ratio)
+        if ratio > 1 + threshold:
+            ok = False
+            print(style.Style.failure(line + " regression"))
+        elif ratio < 1 - threshold:
+            print(style.Style.success(line + " improvement"))
+        else:
+            print(line)
+    return ok
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="pytoolcore hot path benchmarks")
+    parser.add_argument("action", choices=["run", "compare", "list"])
+    parser.add_argument("-b", "--bench", action="append", choices=list(BENCHMARKS.keys()),
+                        help="benchmark to run, all of them by default")
+    parser.add_argument("-o", "--output",
+                        help="write the results to this JSON file, the baseline by default for run")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file used by compare")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--mintime", type=float, default=0.2,
+                        help="minimal duration of a sample in seconds")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown reported as a regression")
+    options = parser.parse_args()
+    if options.action == "list":
+        print("\n".join(BENCHMARKS.keys()))
+        return 0
+    names: typing.List[str] = options.bench or list(BENCHMARKS.keys())
+    if options.action == "compare":
+        try:
+            with open(options.baseline) as fbaseline:
+                baseline: typing.Dict[str, typing.Any] = json.load(fbaseline)
+        except (OSError, ValueError) as err:
+            print(style.Style.error("Can't load baseline {0}: {1}".format(options.baseline, err)))
+            return 2
+    results: typing.Dict[str, typing.Any] = run(names, options.repeat, options.mintime)
+    if options.action == "run" and not options.output:
+        options.output = options.baseline
+        results = merge(options.baseline, results)
+    if options.output:
+        with open(options.output, "w") as foutput:
+            json.dump(results, foutput, indent=2)
+    if options.action == "compare":
+        print()
+        return 0 if compare(baseline, results, options.threshold) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
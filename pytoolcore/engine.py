@@ -1,9 +1,22 @@
+import io
+import os
+import sys
 import copy
 import typing
 import readline
 import shlex
+import pickle
+import asyncio
+import threading
+import contextlib
+import contextvars
+import collections.abc
+import concurrent.futures
+from multiprocessing import shared_memory
+from multiprocessing import resource_tracker
 
 from pytoolcore import style
+from pytoolcore import event
 from pytoolcore import command
 from pytoolcore import exception
 
@@ -31,12 +44,65 @@ class Option:
         return self.__desc__
 
 
+class OptionLayer(collections.abc.MutableMapping):
+    # options of one scope layered over shared options
+    # reads go through to the shared options, an option is only copied in the layer when assigned
+
+    def __init__(self, defaults: typing.MutableMapping[str, Option]) -> None:
+        self.__defaults__: typing.MutableMapping[str, Option] = defaults
+        self.__layer__: typing.Dict[str, Option] = {}
+        self.__removed__: typing.Set[str] = set()
+
+    def __getitem__(self, optname: str) -> Option:
+        try:
+            return self.__layer__[optname]
+        except KeyError:
+            if optname in self.__removed__:
+                raise
+        return self.__defaults__[optname]
+
+    def __setitem__(self, optname: str, option: Option) -> None:
+        self.__removed__.discard(optname)
+        self.__layer__[optname] = option
+
+    def __delitem__(self, optname: str) -> None:
+        if optname not in self:
+            raise KeyError(optname)
+        self.__layer__.pop(optname, None)
+        self.__removed__.add(optname)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        for optname in list(self.__defaults__):
+            if optname not in self.__removed__:
+                yield optname
+        for optname in list(self.__layer__):
+            if optname not in self.__defaults__:
+                yield optname
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, optname: object) -> bool:
+        return optname not in self.__removed__ and \
+            (optname in self.__layer__ or optname in self.__defaults__)
+
+    def assign(self, optname: str, value: str) -> None:
+        try:
+            self.__layer__[optname].value = value
+        except KeyError:
+            # copy on write, the copy only enters the layer if the option accepted the value
+            option: Option = copy.copy(self[optname])
+            option.value = value
+            self.__layer__[optname] = option
+
+
 class CommandSlot:
     def __init__(self, cmd: command.Command, fct: typing.Callable,
-                 helpstr: str) -> None:
+                 helpstr: str, processpool: bool = False) -> None:
         self.__cmd__: command.Command = cmd
         self.__fct__: typing.Callable = fct
         self.__help__: str = helpstr
+        self.__processpool__: bool = processpool
 
     def getfct(self) -> typing.Callable:
         return self.__fct__
@@ -47,9 +113,83 @@ class CommandSlot:
     def gethelp(self) -> str:
         return self.__help__
 
+    def getprocesspool(self) -> bool:
+        return self.__processpool__
+
     fct = property(getfct)
     cmd = property(getcmd)
     cmdhelp = property(gethelp)
+    processpool = property(getprocesspool)
+
+
+# --------------------------------------------------------------------------------------------------#
+#                                       Process pool helpers                                        #
+# --------------------------------------------------------------------------------------------------#
+
+# bytes results above this size come back through shared memory instead of the result pipe
+SHMTHRESHOLD: int = 1 << 20
+
+
+# serialise loads, a handle may be loaded by the done-callback and by the caller at the same time
+SHMLOCK: threading.Lock = threading.Lock()
+
+
+class SharedBytes:
+    # picklable handle on a bytes result left in a shared memory block by a worker
+    def __init__(self, name: str, size: int) -> None:
+        self.__shmname__: str = name
+        self.__size__: int = size
+        self.__data__: typing.Optional[bytes] = None
+
+    def load(self) -> bytes:
+        # the block is unlinked on the first load, later loads return the copied bytes
+        with SHMLOCK:
+            if self.__data__ is None:
+                shm = shared_memory.SharedMemory(name=self.__shmname__)
+                try:
+                    self.__data__ = bytes(shm.buf[:self.__size__])
+                finally:
+                    shm.close()
+                    shm.unlink()
+            return self.__data__
+
+
+def __poolcall__(fct: typing.Callable, args: typing.List[str],
+                 kwargs: typing.Dict[str, str]) -> typing.Tuple[typing.Any, str]:
+    # executed in the worker process, what the handler prints is sent back with the result
+    output: io.StringIO = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            res = fct(*args, **kwargs)
+    except Exception as err:
+        err.__pooloutput__ = output.getvalue()
+        raise
+    if isinstance(res, (bytes, bytearray)) and len(res) >= SHMTHRESHOLD:
+        shm = shared_memory.SharedMemory(create=True, size=len(res))
+        shm.buf[:len(res)] = res
+        handle = SharedBytes(name=shm.name, size=len(res))
+        shm.close()
+        # the parent owns the block from now on and unlinks it once loaded
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return handle, output.getvalue()
+    return res, output.getvalue()
+
+
+def __poolrelease__(future: concurrent.futures.Future) -> None:
+    # done-callback: copy and unlink a shared memory result even if nobody waits for it anymore
+    if not future.cancelled() and future.exception() is None:
+        res = future.result()[0]
+        if isinstance(res, SharedBytes):
+            res.load()
+
+
+def __poolwarmup__() -> None:
+    # no-op submitted once per worker so that they are forked and ready before the first call
+    pass
+
+
+# options and sink of the call being executed, see Engine.scope
+SCOPE: contextvars.ContextVar = contextvars.ContextVar("pytoolcore.engine.scope", default=None)
 
 
 # --------------------------------------------------------------------------------------------------#
@@ -66,8 +206,10 @@ class Engine:
         self.__moduleref__: str = moduleref
         self.__modulename__: str = modulename
         self.__author__: str = author
-        self.__dictoptions__: typing.Dict[str, Option] = {}
+        self.__shareddictoptions__: typing.MutableMapping[str, Option] = {}
         self.__running__: bool = False
+        self.__pool__: typing.Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self.__sharedsink__: event.Sink = event.AnsiSink()
 
         cmdhelp: command.Command = command.Command(cmdname="help", nbpositionals=1)
         cmdset: command.Command = command.Command(cmdname="set", nbpositionals=2)
@@ -113,6 +255,28 @@ class Engine:
                              )
              }
 
+    @property
+    def __dictoptions__(self) -> typing.MutableMapping[str, Option]:
+        scope = SCOPE.get()
+        if scope is not None and scope[0] is self:
+            return scope[1]
+        return self.__shareddictoptions__
+
+    @__dictoptions__.setter
+    def __dictoptions__(self, options: typing.MutableMapping[str, Option]) -> None:
+        self.__shareddictoptions__ = options
+
+    @property
+    def __sink__(self) -> event.Sink:
+        scope = SCOPE.get()
+        if scope is not None and scope[0] is self:
+            return scope[2]
+        return self.__sharedsink__
+
+    @__sink__.setter
+    def __sink__(self, sink: event.Sink) -> None:
+        self.__sharedsink__ = sink
+
     def __autoupdatehelp__(self):
         self.__dictcmd__["help"].cmd.__completionlist__ = list(self.__dictcmd__.keys())
 
@@ -122,26 +286,28 @@ class Engine:
 
     def __help__(self, cmd: str) -> bool:
         try:
-            print(style.Style.info("{0}'s help\n{1}".format(cmd, self.__dictcmd__[cmd].__help__)))
+            self.emit(event.INFO, "help.show", "{0}'s help\n{1}", cmd, self.__dictcmd__[cmd].__help__)
         except KeyError:
-            print(style.Style.error("Keyword {0} isn't a defined command.".format(cmd)))
+            self.emit(event.ERROR, "help.notfound", "Keyword {0} isn't a defined command.", cmd)
         return True
 
     def __set__(self, optname: str, value: str, verbose: bool = True) -> None:
         optname = optname.lower()
         try:
-            self.__dictoptions__[optname].value = value
-            if not value:
-                value = '""'
+            options: typing.MutableMapping[str, Option] = self.__dictoptions__
+            if isinstance(options, OptionLayer):
+                options.assign(optname, value)
+            else:
+                options[optname].value = value
             if verbose:
-                print(style.Style.success("Option {0} set at {1}".format(optname, str(value))))
+                self.emit(event.SUCCESS, "option.set", "Option {0} set at {1}", optname, value or '""')
         except exception.ErrorException:
             if verbose:
-                print(style.Style.failure("Impossible to assign {0} to {1} with set command".format(
-                    optname, str(value))))
+                self.emit(event.FAILURE, "option.invalid", "Impossible to assign {0} to {1} with set command",
+                          optname, value)
         except KeyError:
             if verbose:
-                print(style.Style.error(str.format("Option {0} isn't defined.", optname)))
+                self.emit(event.ERROR, "option.notfound", "Option {0} isn't defined.", optname)
 
     def __reset__(self, optname: str) -> None:
         optname = optname.lower()
@@ -154,61 +320,139 @@ class Engine:
     def __show__(self, keyword: str) -> None:
         keyword = keyword.lower()
         if keyword == "options":
-            print(style.Style.info("{0}'s options".format(self.name)))
+            self.emit(event.INFO, "show.options", "{0}'s options", self.name)
             headers: typing.List[str] = ["Option", "Current setting", "Description"]
             table: typing.List[typing.List[str]] = []
             for optname, opt in self.__dictoptions__.items():
                 table.append([optname, opt.value, opt.desc])
-            print(style.Style.tabulate(headers, table))
-            print()
+            self.emit(event.TABLE, "show.options", "", headers, table)
         elif keyword == "commands":
-            print(style.Style.info("{0}'s commands".format(self.name)))
+            self.emit(event.INFO, "show.commands", "{0}'s commands", self.name)
             headers: typing.List[str] = ["Command", "Help"]
             table: typing.List[typing.List[str]] = []
             for cmdname, cmd in self.__dictcmd__.items():
                 table.append([cmdname, cmd.cmdhelp])
-            print(style.Style.tabulate(headers, table, True))
-            print()
+            self.emit(event.TABLE, "show.commands", "", headers, table, True)
         elif keyword == "author":
-            print(style.Style.info("{0}'s author".format(self.name)))
-            print(style.Style.tabulate(["Author"], [[self.author]]))
-            print()
+            self.emit(event.INFO, "show.author", "{0}'s author", self.name)
+            self.emit(event.TABLE, "show.author", "", ["Author"], [[self.author]])
         elif keyword == "name":
-            print(style.Style.info("{0}'s name".format(self.name)))
-            print(style.Style.tabulate(["Name"], [[self.name]]))
-            print()
+            self.emit(event.INFO, "show.name", "{0}'s name", self.name)
+            self.emit(event.TABLE, "show.name", "", ["Name"], [[self.name]])
         else:
             try:
-                print(style.Style.tabulate(["Option", "Current Setting", "Description"],
-                                           [[keyword, self.getoptionvalue(keyword), self.getoptiondesc(keyword)]]))
-                print()
+                self.emit(event.TABLE, "show.option", "", ["Option", "Current Setting", "Description"],
+                          [[keyword, self.getoptionvalue(keyword), self.getoptiondesc(keyword)]])
             except KeyError:
-                print(style.Style.error("Option {0} isn't defined.".format(keyword)))
+                self.emit(event.ERROR, "option.notfound", "Option {0} isn't defined.", keyword)
 
     @staticmethod
     def __clear__() -> None:
         style.clear()
 
-    def __call__(self, cmdline) -> bool:
-        # unpack arguments and call function
+    def __startpool__(self) -> concurrent.futures.ProcessPoolExecutor:
+        if self.__pool__ is None:
+            nbworkers: int = os.cpu_count() or 1
+            self.__pool__ = concurrent.futures.ProcessPoolExecutor(max_workers=nbworkers)
+            # workers are only started on submit, prime all of them now
+            concurrent.futures.wait([self.__pool__.submit(__poolwarmup__) for _ in range(nbworkers)])
+        return self.__pool__
+
+    def __poolsubmit__(self, fct: typing.Callable, args: typing.List[str],
+                       kwargs: typing.Dict[str, str]) \
+            -> typing.Tuple[concurrent.futures.ProcessPoolExecutor, concurrent.futures.Future]:
+        pool: concurrent.futures.ProcessPoolExecutor = self.__startpool__()
         try:
-            cmdname: str = shlex.split(cmdline)[0].lower()  # trigger exception if empty cmdline
+            future: concurrent.futures.Future = pool.submit(__poolcall__, fct, args, kwargs)
+        except concurrent.futures.BrokenExecutor:
+            # a worker died between two calls, retry once on a fresh pool
+            self.__droppool__(pool)
+            pool = self.__startpool__()
             try:
-                # Make a copy of the command to avoid modifying the model
-                try:
-                    cmd: command.Command = self.__dictcmd__[cmdname].cmd.clone()
-                except KeyError:
-                    raise exception.ErrorException(str.format("Command {0} not found", cmdname))
-                args, kwargs = cmd.parse(cmdline)
-                return self.__dictcmd__[cmdname].fct(*args, **kwargs)
-            except KeyError as err:
-                print(style.Style.error(str.format("Key {0} not found", str(err))))
-            except (exception.ErrorException, exception.FailureException, exception.WarningException,
-                    exception.InfoException, exception.SuccessException) as err:
-                print(str(err))
+                future = pool.submit(__poolcall__, fct, args, kwargs)
+            except concurrent.futures.BrokenExecutor:
+                self.__droppool__(pool)
+                raise exception.FailureException("Process pool is broken, the command wasn't executed")
+        future.add_done_callback(__poolrelease__)
+        return pool, future
+
+    def __droppool__(self, pool: concurrent.futures.ProcessPoolExecutor) -> None:
+        pool.shutdown(wait=False, cancel_futures=True)
+        if self.__pool__ is pool:
+            self.__pool__ = None
+
+    def __poolresult__(self, pool: concurrent.futures.ProcessPoolExecutor,
+                       future: concurrent.futures.Future) -> typing.Any:
+        try:
+            res, output = future.result()
+        except concurrent.futures.BrokenExecutor:
+            self.__droppool__(pool)
+            raise exception.FailureException("Worker process died while executing the command")
+        except Exception as err:
+            sys.stdout.write(getattr(err, "__pooloutput__", ""))
+            raise
+        sys.stdout.write(output)
+        if isinstance(res, SharedBytes):
+            res = res.load()
+        return res
+
+    def __poolexec__(self, fct: typing.Callable, args: typing.List[str],
+                     kwargs: typing.Dict[str, str]) -> typing.Any:
+        pool, future = self.__poolsubmit__(fct, args, kwargs)
+        try:
+            concurrent.futures.wait([future])
+        except KeyboardInterrupt:
+            future.cancel()
+            raise
+        return self.__poolresult__(pool, future)
+
+    def __prepare__(self, cmdline: str) \
+            -> typing.Tuple[CommandSlot, typing.List[str], typing.Dict[str, str]]:
+        cmdname: str = shlex.split(cmdline)[0].lower()  # trigger exception if empty cmdline
+        # Make a copy of the command to avoid modifying the model
+        try:
+            cmd: command.Command = self.__dictcmd__[cmdname].cmd.clone()
+        except KeyError:
+            raise exception.ErrorException("Command {0} not found", cmdname, code="command.notfound")
+        args, kwargs = cmd.parse(cmdline)
+        return self.__dictcmd__[cmdname], args, kwargs
+
+    @contextlib.contextmanager
+    def __reporterrors__(self) -> typing.Iterator[None]:
+        # turn the errors of a command into events
+        try:
+            yield
         except IndexError:
             # empty input
             pass
+        except KeyError as err:
+            self.emit(event.ERROR, "key.notfound", "Key {0} not found", err)
+        except exception.EventException as err:
+            self.__sink__.emit(err.event)
+
+    def __call__(self, cmdline) -> bool:
+        # unpack arguments and call function
+        with self.__reporterrors__():
+            slot, args, kwargs = self.__prepare__(cmdline)
+            if slot.processpool:
+                return self.__poolexec__(slot.fct, args, kwargs)
+            return slot.fct(*args, **kwargs)
+        return True
+
+    async def asynccall(self, cmdline) -> bool:
+        # same as __call__ without blocking the event loop while the handler runs
+        try:
+            processpool: bool = self.__dictcmd__[shlex.split(cmdline)[0].lower()].processpool
+        except (IndexError, KeyError, ValueError):
+            processpool = False
+        if not processpool:
+            # to_thread copies the context, the handler sees the caller's scope
+            return await asyncio.to_thread(self.__call__, cmdline)
+        with self.__reporterrors__():
+            slot, args, kwargs = self.__prepare__(cmdline)
+            pool, future = self.__poolsubmit__(slot.fct, args, kwargs)
+            await asyncio.wait([asyncio.wrap_future(future)])
+            return self.__poolresult__(pool, future)
         return True
 
     # ------------------------------------------------------------------------------------------#
@@ -224,13 +468,23 @@ class Engine:
         return self.__moduleref__
 
     def addcmd(self, cmd: command.Command, fct: typing.Callable,
-               helpstr: str) -> None:
+               helpstr: str, processpool: bool = False) -> None:
+        if processpool:
+            # the handler is shipped to the workers, it must be a module level function
+            try:
+                pickle.dumps(fct)
+            except (pickle.PicklingError, TypeError, AttributeError):
+                raise exception.ErrorException(str.format("Command {0} handler can't be sent " +
+                                                          "to a worker process", cmd.__cmdname__))
         try:
             self.removecmd(cmd.__cmdname__)
         except KeyError:
             pass
         self.__dictcmd__[cmd.__cmdname__] = CommandSlot(fct=fct, cmd=cmd,
-                                                        helpstr=str(helpstr))
+                                                        helpstr=str(helpstr),
+                                                        processpool=processpool)
+        if processpool:
+            self.__startpool__()
         self.__autoupdatehelp__()
 
     def removecmd(self, cmdname: str) -> None:
@@ -257,7 +511,7 @@ class Engine:
                 pass
             self.__dictoptions__[optname] = Option(optname=optname, value=value, desc=description)
         else:
-            print(style.Style.error("Option must have a name"))
+            self.emit(event.ERROR, "option.noname", "Option must have a name")
 
     def removeoption(self, optname: str) -> None:
         try:
@@ -283,8 +537,28 @@ class Engine:
     def show(self, keyword: str) -> None:
         self.__show__(keyword)
 
+    @property
+    def sink(self) -> event.Sink:
+        return self.__sink__
+
+    @sink.setter
+    def sink(self, sink: event.Sink) -> None:
+        self.__sink__ = sink
+
+    @contextlib.contextmanager
+    def scope(self, options: typing.MutableMapping[str, Option], sink: event.Sink) -> typing.Iterator[None]:
+        # run the calls made in this context with their own options and sink
+        token: contextvars.Token = SCOPE.set((self, options, sink))
+        try:
+            yield
+        finally:
+            SCOPE.reset(token)
+
+    def emit(self, level: str, code: str, template: str, *args: typing.Any) -> None:
+        self.__sink__.emit(event.Event(level, code, template, *args))
+
     def splash(self) -> None:
-        print("\n\t{0} module by {1} \n".format(self.__modulename__, self.author))
+        self.__sink__.write("\n\t{0} module by {1} \n".format(self.__modulename__, self.author))
 
     def run(self) -> None:
         readline.set_completer_delims('\t')
@@ -299,16 +573,27 @@ class Engine:
                 print()
                 break
             except(KeyError, ValueError) as err:
-                print(style.Style.error(str(err)))
+                self.emit(event.ERROR, "engine.error", "{0}", err)
             except exception.ErrorException as err:
-                print(str(err))
+                self.__sink__.emit(err.event)
                 break
         self.stop()
+        self.shutdownpool()
         return
 
+    def serve(self, path: str = None, host: str = "127.0.0.1", port: int = None) -> None:
+        # share this engine with many clients over a unix socket (path) or localhost tcp
+        from pytoolcore import server
+        server.serve(self, path=path, host=host, port=port)
+
     def stop(self) -> None:
         pass
 
+    def shutdownpool(self) -> None:
+        if self.__pool__ is not None:
+            self.__pool__.shutdown(wait=True, cancel_futures=True)
+            self.__pool__ = None
+
     def completer(self, text: str, state: int) -> str:
         subtext: str = text.split(" ")[-1].lower()
         if len(text.split(" ")) == 1:
@@ -0,0 +1,135 @@
+import abc
+import sys
+import json
+import typing
+
+from pytoolcore import style
+
+
+ERROR: str = "error"
+FAILURE: str = "failure"
+WARNING: str = "warning"
+INFO: str = "info"
+SUCCESS: str = "success"
+OUTPUT: str = "output"
+TABLE: str = "table"
+
+STYLES: typing.Dict[str, typing.Callable[[str], str]] = {
+    ERROR: style.Style.error,
+    FAILURE: style.Style.failure,
+    WARNING: style.Style.warning,
+    INFO: style.Style.info,
+    SUCCESS: style.Style.success,
+    OUTPUT: str,
+    TABLE: str
+}
+
+PREFIXES: typing.Dict[str, str] = {
+    ERROR: style.Style.ERRORPREFIX,
+    FAILURE: style.Style.FAILUREPREFIX,
+    WARNING: style.Style.WARNINGSIGN + style.Style.WARNINGPREFIX,
+    INFO: style.Style.INFOPREFIX,
+    SUCCESS: style.Style.SUCCESSPREFIX,
+    OUTPUT: "",
+    TABLE: ""
+}
+
+
+# ----------------------------------------------------------------------------------------------#
+#                                           Event                                               #
+# ----------------------------------------------------------------------------------------------#
+
+class Event:
+    # the message is only built from the template when a sink asks for it
+    # a TABLE event carries (headers, rows, withindex) as args and is rendered by tabulate
+    __slots__ = ("__level__", "__code__", "__template__", "__args__")
+
+    def __init__(self, level: str, code: str, template: str, *args: typing.Any) -> None:
+        self.__level__: str = level
+        self.__code__: str = code
+        self.__template__: str = template
+        self.__args__: typing.Tuple[typing.Any, ...] = args
+
+    @property
+    def level(self) -> str:
+        return self.__level__
+
+    @property
+    def code(self) -> str:
+        return self.__code__
+
+    @property
+    def template(self) -> str:
+        return self.__template__
+
+    @property
+    def args(self) -> typing.Tuple[typing.Any, ...]:
+        return self.__args__
+
+    @property
+    def message(self) -> str:
+        if self.__level__ == TABLE:
+            return style.Style.tabulate(*self.__args__) + "\n"
+        if self.__args__:
+            return self.__template__.format(*self.__args__)
+        return self.__template__
+
+    def __str__(self) -> str:
+        return STYLES[self.__level__](self.message)
+
+
+# ----------------------------------------------------------------------------------------------#
+#                                           Sinks                                               #
+# ----------------------------------------------------------------------------------------------#
+
+class Sink(abc.ABC):
+
+    def __init__(self, stream: typing.TextIO = None) -> None:
+        self.__stream__: typing.Optional[typing.TextIO] = stream
+
+    @property
+    def stream(self) -> typing.TextIO:
+        # resolved on use so that redirections of sys.stdout are honoured
+        if self.__stream__ is None:
+            return sys.stdout
+        return self.__stream__
+
+    @abc.abstractmethod
+    def emit(self, evt: Event) -> None:
+        pass
+
+    def write(self, text: str) -> None:
+        self.emit(Event(OUTPUT, OUTPUT, text))
+
+
+class NullSink(Sink):
+
+    def emit(self, evt: Event) -> None:
+        pass
+
+
+class AnsiSink(Sink):
+
+    def emit(self, evt: Event) -> None:
+        print(STYLES[evt.level](evt.message), file=self.stream)
+
+
+class PlainSink(Sink):
+
+    def emit(self, evt: Event) -> None:
+        print(PREFIXES[evt.level] + evt.message, file=self.stream)
+
+
+class JsonLinesSink(Sink):
+
+    def __init__(self, stream: typing.TextIO = None) -> None:
+        super(JsonLinesSink, self).__init__(stream)
+        self.__encoder__: json.JSONEncoder = json.JSONEncoder(ensure_ascii=False, default=str)
+
+    def emit(self, evt: Event) -> None:
+        record: typing.Dict[str, typing.Any] = {"level": evt.level, "code": evt.code,
+                                                "template": evt.template, "args": evt.args}
+        if evt.level != TABLE:
+            # tables are left structured, consumers render them from args if they need to
+            record["message"] = evt.message
+        self.stream.write(self.__encoder__.encode(record) + "\n")
@@ -1,32 +1,42 @@
+import typing
 
-from pytoolcore import style
+from pytoolcore import event
 
 
-class ErrorException(Exception):
+class EventException(Exception):
+    LEVEL: str = event.ERROR
 
-    def __str__(self)->str:
-        return style.Style.error(super(ErrorException, self).__str__())
+    def __init__(self, template: str = "", *args: typing.Any, code: str = None) -> None:
+        super(EventException, self).__init__(template, *args)
+        self.code: str = code if code is not None else self.LEVEL
 
+    @property
+    def event(self) -> event.Event:
+        return event.Event(self.LEVEL, self.code, *self.args)
 
-class FailureException(Exception):
+    @property
+    def message(self) -> str:
+        return self.event.message
 
-    def __str__(self)->str:
-        return style.Style.failure(super(FailureException, self).__str__())
+    def __str__(self) -> str:
+        return str(self.event)
 
 
-class WarningException(Exception):
+class ErrorException(EventException):
+    LEVEL: str = event.ERROR
 
-    def __str__(self)->str:
-        return style.Style.warning(super(WarningException, self).__str__())
 
+class FailureException(EventException):
+    LEVEL: str = event.FAILURE
 
-class InfoException(Exception):
 
-    def __str__(self)->str:
-        return style.Style.info(super(InfoException, self).__str__())
+class WarningException(EventException):
+    LEVEL: str = event.WARNING
 
 
-class SuccessException(Exception):
+class InfoException(EventException):
+    LEVEL: str = event.INFO
 
-    def __str__(self)->str:
-        return style.Style.success(super(SuccessException, self).__str__())
+
+class SuccessException(EventException):
+    LEVEL: str = event.SUCCESS
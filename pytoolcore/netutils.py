@@ -3,6 +3,7 @@ import fcntl
 import struct
 import ipaddress
 import re
+import bisect
 import typing
 from pytoolcore import exception
 
@@ -115,5 +116,166 @@ def host2protocol(host: str) -> int:
     return getsockinfo(host, None)[0]
 
 
-def gethostsfromnetwork(netaddr: str) -> typing.List[str]:
-    return list(str(host) for host in ipaddress.ip_network(netaddr).hosts())
+def gethostsfromnetwork(netaddr: str, scope: "AddressSet" = None) -> typing.List[str]:
+    if scope is None:
+        return list(str(host) for host in ipaddress.ip_network(netaddr).hosts())
+    network = ipaddress.ip_network(netaddr)
+    first: int = int(network.network_address)
+    last: int = int(network.broadcast_address)
+    if network.num_addresses > 2:
+        # same bounds as ipaddress' hosts()
+        first += 1
+        if network.version == 4:
+            last -= 1
+    addrtype = ipaddress.IPv4Address if network.version == 4 else ipaddress.IPv6Address
+    hosts: typing.List[str] = []
+    for start, end in scope.intersect(network.version, first, last):
+        hosts += [str(addrtype(host)) for host in range(start, end + 1)]
+    return hosts
+
+
+# ----------------------------------------------------------------------------------------------#
+#                                       Address set index                                       #
+# ----------------------------------------------------------------------------------------------#
+
+class AddressSet:
+    # Merged CIDR intervals stored as sorted integer arrays, one table per IP version.
+    # Membership is a bisection, longest-prefix match probes each known prefix length.
+
+    def __init__(self, networks: typing.Iterable[str] = None) -> None:
+        self.__starts__: typing.Dict[int, typing.List[int]] = {4: [], 6: []}
+        self.__ends__: typing.Dict[int, typing.List[int]] = {4: [], 6: []}
+        self.__prefixes__: typing.Dict[int, typing.Dict[int, typing.Dict[int, str]]] = {4: {}, 6: {}}
+        self.__pending__: typing.Dict[int, typing.List[typing.Tuple[int, int]]] = {4: [], 6: []}
+        if networks is not None:
+            for netaddr in networks:
+                self.add(netaddr)
+
+    @staticmethod
+    def __parseaddr__(ipaddr: str) -> typing.Tuple[int, int]:
+        ipaddr = ipaddr.split("%")[0]  # in case of ipv6 local-link
+        addr = ipaddress.ip_address(ipaddr)
+        return addr.version, int(addr)
+
+    def __merge__(self, version: int) -> None:
+        # fold the pending networks into the sorted interval arrays
+        if not self.__pending__[version]:
+            return
+        intervals = sorted(list(zip(self.__starts__[version], self.__ends__[version])) +
+                           self.__pending__[version])
+        starts: typing.List[int] = []
+        ends: typing.List[int] = []
+        for start, end in intervals:
+            if ends and start <= ends[-1] + 1:
+                if end > ends[-1]:
+                    ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+        self.__starts__[version] = starts
+        self.__ends__[version] = ends
+        self.__pending__[version] = []
+
+    def __locate__(self, version: int, addr: int) -> bool:
+        starts: typing.List[int] = self.__starts__[version]
+        i: int = bisect.bisect_right(starts, addr) - 1
+        return i >= 0 and addr <= self.__ends__[version][i]
+
+    def __len__(self) -> int:
+        self.__merge__(4)
+        self.__merge__(6)
+        return len(self.__starts__[4]) + len(self.__starts__[6])
+
+    def __contains__(self, ipaddr: str) -> bool:
+        return self.contains(ipaddr)
+
+    def add(self, netaddr: str) -> None:
+        try:
+            network = ipaddress.ip_network(netaddr.split("%")[0], strict=False)
+        except ValueError as err:
+            raise exception.ErrorException(str(err))
+        first: int = int(network.network_address)
+        self.__pending__[network.version].append((first, int(network.broadcast_address)))
+        self.__prefixes__[network.version].setdefault(network.prefixlen, {})[first] = \
+            str(network)
+
+    def contains(self, ipaddr: str) -> bool:
+        try:
+            version, addr = AddressSet.__parseaddr__(ipaddr)
+        except ValueError:
+            return False
+        self.__merge__(version)
+        return self.__locate__(version, addr)
+
+    def containsmany(self, ipaddrs: typing.Iterable[str]) -> typing.List[bool]:
+        # sort the queries once and sweep them against the intervals
+        results: typing.List[bool] = []
+        queries: typing.Dict[int, typing.List[typing.Tuple[int, int]]] = {4: [], 6: []}
+        for index, ipaddr in enumerate(ipaddrs):
+            results.append(False)
+            try:
+                version, addr = AddressSet.__parseaddr__(ipaddr)
+            except ValueError:
+                continue
+            queries[version].append((addr, index))
+        for version in (4, 6):
+            if not queries[version]:
+                continue
+            self.__merge__(version)
+            starts: typing.List[int] = self.__starts__[version]
+            ends: typing.List[int] = self.__ends__[version]
+            i: int = 0
+            for addr, index in sorted(queries[version]):
+                while i < len(ends) and ends[i] < addr:
+                    i += 1
+                if i == len(ends):
+                    break
+                results[index] = starts[i] <= addr
+        return results
+
+    def longestprefix(self, ipaddr: str) -> typing.Optional[str]:
+        # return the most specific network added which holds the address
+        try:
+            version, addr = AddressSet.__parseaddr__(ipaddr)
+        except ValueError:
+            return None
+        bits: int = 32 if version == 4 else 128
+        for prefixlen in sorted(self.__prefixes__[version].keys(), reverse=True):
+            mask: int = ((1 << prefixlen) - 1) << (bits - prefixlen)
+            try:
+                return self.__prefixes__[version][prefixlen][addr & mask]
+            except KeyError:
+                continue
+        return None
+
+    def filter(self, ipaddrs: typing.Iterable[str]) -> typing.List[str]:
+        ipaddrs = list(ipaddrs)
+        return [ipaddr for ipaddr, present in zip(ipaddrs, self.containsmany(ipaddrs)) if present]
+
+    def intersect(self, version: int, first: int, last: int) -> typing.List[typing.Tuple[int, int]]:
+        # return the merged intervals clipped to [first, last]
+        self.__merge__(version)
+        starts: typing.List[int] = self.__starts__[version]
+        ends: typing.List[int] = self.__ends__[version]
+        intervals: typing.List[typing.Tuple[int, int]] = []
+        i: int = max(bisect.bisect_right(starts, first) - 1, 0)
+        while i < len(starts) and starts[i] <= last:
+            if ends[i] >= first:
+                intervals.append((max(starts[i], first), min(ends[i], last)))
+            i += 1
+        return intervals
+
+    def networks(self) -> typing.List[str]:
+        # return the merged content as a minimal list of CIDR
+        networks: typing.List[str] = []
+        for version in (4, 6):
+            self.__merge__(version)
+            addrtype = ipaddress.IPv4Address if version == 4 else ipaddress.IPv6Address
+            for start, end in zip(self.__starts__[version], self.__ends__[version]):
+                networks += [str(net) for net in
+                             ipaddress.summarize_address_range(addrtype(start), addrtype(end))]
+        return networks
+
+
+def isaddrinscope(ipaddr: str, scope: AddressSet) -> bool:
+    return isipaddr(ipaddr) and scope.contains(ipaddr)
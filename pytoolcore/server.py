@@ -0,0 +1,302 @@
+import io
+import sys
+import json
+import shlex
+import socket
+import typing
+import asyncio
+import argparse
+import contextvars
+
+from pytoolcore import style
+from pytoolcore import event
+from pytoolcore import engine
+
+
+# Line protocol: the client sends one command line per line, the server answers with
+# the resulting events as JSON lines followed by a DONE event.
+DONE: str = "done"
+STDOUT: str = "stdout"
+CLEAR: str = "clear"
+
+# tcp port used when neither a unix socket path nor a port is given, 0 picks a free port
+DEFAULTPORT: int = 47011
+
+# output stream of the session whose command is being executed
+STREAM: contextvars.ContextVar = contextvars.ContextVar("pytoolcore.server.stream", default=None)
+
+
+def getcmdname(cmdline: str) -> str:
+    try:
+        return shlex.split(cmdline)[0].lower()
+    except (IndexError, ValueError):
+        return ""
+
+
+# ----------------------------------------------------------------------------------------------#
+#                                       Client session                                          #
+# ----------------------------------------------------------------------------------------------#
+
+class EventStream(io.TextIOBase):
+    # turn what handlers print into events so that ordering with the other events is kept
+
+    def __init__(self, sink: event.Sink) -> None:
+        super(EventStream, self).__init__()
+        self.__sink__: event.Sink = sink
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            self.__sink__.emit(event.Event(event.OUTPUT, STDOUT, text))
+        return len(text)
+
+
+class ContextStdout(io.TextIOBase):
+    # sys.stdout replacement while serving, writes go to the stream of the current session
+
+    def __init__(self, fallback: typing.TextIO) -> None:
+        super(ContextStdout, self).__init__()
+        self.__fallback__: typing.TextIO = fallback
+
+    @property
+    def fallback(self) -> typing.TextIO:
+        return self.__fallback__
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        stream: typing.Optional[typing.TextIO] = STREAM.get()
+        if stream is None:
+            return self.__fallback__.write(text)
+        return stream.write(text)
+
+    def flush(self) -> None:
+        if STREAM.get() is None:
+            self.__fallback__.flush()
+
+
+class Session:
+
+    def __init__(self, eng: engine.Engine, writer: asyncio.StreamWriter) -> None:
+        self.__engine__: engine.Engine = eng
+        self.__options__: engine.OptionLayer = engine.OptionLayer(eng.__dictoptions__)
+        self.__buffer__: io.StringIO = io.StringIO()
+        self.__sink__: event.JsonLinesSink = event.JsonLinesSink(self.__buffer__)
+        self.__stream__: EventStream = EventStream(self.__sink__)
+        self.__writer__: asyncio.StreamWriter = writer
+
+    async def __execute__(self, cmdline: str) -> None:
+        # the engine is shared, the call runs with this client's options and output
+        eng: engine.Engine = self.__engine__
+        token: contextvars.Token = STREAM.set(self.__stream__)
+        try:
+            with eng.scope(self.__options__, self.__sink__):
+                try:
+                    await eng.asynccall(cmdline)
+                except Exception as err:
+                    eng.emit(event.ERROR, "server.error", "{0}", err)
+        finally:
+            STREAM.reset(token)
+
+    async def reply(self, cmdline: str) -> bool:
+        # return False once the client asked to leave
+        cmdname: str = getcmdname(cmdline)
+        if cmdname == "exit":
+            # exit only closes this client's session
+            pass
+        elif cmdname == "clear":
+            # the client clears its own terminal
+            self.__sink__.emit(event.Event(event.OUTPUT, CLEAR, ""))
+        else:
+            await self.__execute__(cmdline)
+        self.__sink__.emit(event.Event(DONE, DONE, ""))
+        self.__writer__.write(self.__buffer__.getvalue().encode())
+        self.__buffer__.seek(0)
+        self.__buffer__.truncate()
+        await self.__writer__.drain()
+        return cmdname != "exit"
+
+
+# ----------------------------------------------------------------------------------------------#
+#                                           Server                                              #
+# ----------------------------------------------------------------------------------------------#
+
+class EngineServer:
+
+    def __init__(self, eng: engine.Engine, path: str = None,
+                 host: str = "127.0.0.1", port: int = None) -> None:
+        self.__engine__: engine.Engine = eng
+        self.__path__: typing.Optional[str] = path
+        self.__host__: str = host
+        self.__port__: int = DEFAULTPORT if port is None else port
+        self.__server__: typing.Optional[asyncio.AbstractServer] = None
+        self.__stdout__: typing.Optional[ContextStdout] = None
+        self.__handlers__: typing.Set[asyncio.Task] = set()
+
+    async def __handle__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        sock: typing.Optional[socket.socket] = writer.get_extra_info("socket")
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        session: Session = Session(self.__engine__, writer)
+        task: asyncio.Task = asyncio.current_task()
+        self.__handlers__.add(task)
+        try:
+            while True:
+                line: bytes = await reader.readline()
+                if not line:
+                    break
+                if not await session.reply(line.decode().rstrip("\r\n")):
+                    break
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.__handlers__.discard(task)
+            writer.close()
+
+    @property
+    def address(self) -> typing.Any:
+        if self.__server__ is None:
+            return None
+        return self.__server__.sockets[0].getsockname()
+
+    async def start(self) -> None:
+        if self.__path__:
+            self.__server__ = await asyncio.start_unix_server(self.__handle__, path=self.__path__)
+        else:
+            self.__server__ = await asyncio.start_server(self.__handle__, host=self.__host__,
+                                                         port=self.__port__)
+        if not isinstance(sys.stdout, ContextStdout):
+            self.__stdout__ = ContextStdout(sys.stdout)
+            sys.stdout = self.__stdout__
+
+    async def serve(self) -> None:
+        if self.__server__ is None:
+            await self.start()
+        self.__engine__.emit(event.INFO, "server.listening", "{0} listening on {1}",
+                             self.__engine__.name, self.address)
+        async with self.__server__:
+            await self.__server__.serve_forever()
+
+    async def shutdown(self) -> None:
+        # stop listening and end the sessions still open
+        self.close()
+        handlers: typing.List[asyncio.Task] = list(self.__handlers__)
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+    def close(self) -> None:
+        if self.__server__ is not None:
+            self.__server__.close()
+        if self.__stdout__ is not None:
+            if sys.stdout is self.__stdout__:
+                sys.stdout = self.__stdout__.fallback
+            self.__stdout__ = None
+
+
+def serve(eng: engine.Engine, path: str = None, host: str = "127.0.0.1", port: int = None) -> None:
+    server: EngineServer = EngineServer(eng, path=path, host=host, port=port)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        eng.stop()
+        eng.shutdownpool()
+
+
+# ----------------------------------------------------------------------------------------------#
+#                                           Client                                              #
+# ----------------------------------------------------------------------------------------------#
+
+class Client:
+
+    def __init__(self, path: str = None, host: str = "127.0.0.1", port: int = DEFAULTPORT) -> None:
+        if path:
+            self.__socket__: socket.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.__socket__.connect(path)
+        else:
+            self.__socket__ = socket.create_connection((host, port))
+            self.__socket__.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.__file__: typing.BinaryIO = self.__socket__.makefile("rb")
+        self.__closed__: bool = False
+
+    def __call__(self, cmdline: str) -> typing.List[event.Event]:
+        if self.__closed__:
+            raise ConnectionError("Client is closed")
+        self.__socket__.sendall(cmdline.encode() + b"\n")
+        events: typing.List[event.Event] = []
+        while True:
+            line: bytes = self.__file__.readline()
+            if not line:
+                self.close()
+                raise ConnectionError("Server closed the connection")
+            evt: typing.Dict[str, typing.Any] = json.loads(line)
+            if evt["level"] == DONE:
+                break
+            if evt["level"] == event.TABLE:
+                events.append(event.Event(evt["level"], evt["code"], evt["template"], *evt["args"]))
+            else:
+                events.append(event.Event(evt["level"], evt["code"], evt["message"]))
+        if getcmdname(cmdline) == "exit":
+            self.close()
+        return events
+
+    @property
+    def closed(self) -> bool:
+        return self.__closed__
+
+    def close(self) -> None:
+        if not self.__closed__:
+            self.__closed__ = True
+            self.__file__.close()
+            self.__socket__.close()
+
+
+def prompt() -> typing.Iterator[str]:
+    while True:
+        try:
+            yield input("> ")
+        except EOFError:
+            return
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="pytoolcore engine server client")
+    parser.add_argument("-u", "--unix", help="unix socket path of the server")
+    parser.add_argument("-H", "--host", default="127.0.0.1")
+    parser.add_argument("-p", "--port", type=int, default=DEFAULTPORT)
+    parser.add_argument("-c", "--command", action="append",
+                        help="command to run, read them from stdin if omitted")
+    options = parser.parse_args()
+    sink: event.Sink = event.AnsiSink() if sys.stdout.isatty() else event.PlainSink()
+    try:
+        client: Client = Client(path=options.unix, host=options.host, port=options.port)
+    except OSError as err:
+        sink.emit(event.Event(event.ERROR, "client.connect", "Can't connect to the server: {0}", err))
+        return 1
+    cmdlines: typing.Iterable[str] = options.command or (prompt() if sys.stdin.isatty() else sys.stdin)
+    try:
+        for cmdline in cmdlines:
+            for evt in client(cmdline.rstrip("\n")):
+                if evt.code == STDOUT:
+                    sys.stdout.write(evt.message)
+                elif evt.code == CLEAR:
+                    style.clear()
+                else:
+                    sink.emit(evt)
+            if client.closed:
+                break
+    except (KeyboardInterrupt, ConnectionError):
+        pass
+    finally:
+        client.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
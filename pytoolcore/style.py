@@ -17,6 +17,13 @@ class Style:
     BOLDEND = '\033[22m'
     UNDERLINEEND = '\033[24m'
 
+    ERRORPREFIX = "(!) Error: "
+    WARNINGSIGN = "/!\\"
+    WARNINGPREFIX = " Warning: "
+    INFOPREFIX = "(i) Information: "
+    FAILUREPREFIX = "[-] Failure: "
+    SUCCESSPREFIX = "[+] Success: "
+
     @staticmethod
     def purple(string: str) -> str:
         return Style.PURPLE + string + Style.END
@@ -55,23 +62,23 @@ class Style:
 
     @staticmethod
     def error(string: str) -> str:
-        return Style.red("(!) Error: ") + string
+        return Style.red(Style.ERRORPREFIX) + string
 
     @staticmethod
     def warning(string: str) -> str:
-        return Style.yellow(Style.underline("/!\\")) + Style.yellow(" Warning: ") + string
+        return Style.yellow(Style.underline(Style.WARNINGSIGN)) + Style.yellow(Style.WARNINGPREFIX) + string
 
     @staticmethod
     def info(string: str) -> str:
-        return Style.darkcyan("(i) Information: ") + string
+        return Style.darkcyan(Style.INFOPREFIX) + string
 
     @staticmethod
     def failure(string: str) -> str:
-        return Style.red("[-] Failure: ") + string
+        return Style.red(Style.FAILUREPREFIX) + string
 
     @staticmethod
     def success(string: str) -> str:
-        return Style.green("[+] Success: ") + string
+        return Style.green(Style.SUCCESSPREFIX) + string
 
     @staticmethod
     def tabulate(headers: typing.List[str], table: typing.List[typing.List[str]],
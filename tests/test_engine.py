@@ -0,0 +1,90 @@
+import os
+import glob
+import time
+import signal
+import unittest
+
+from pytoolcore import command
+from pytoolcore import engine
+from pytoolcore import event
+from pytoolcore import exception
+
+
+def big(size: str) -> bytes:
+    return b"\xab" * int(size)
+
+
+def fail(level: str) -> None:
+    raise {"warning": exception.WarningException,
+           "failure": exception.FailureException}[level]("worker {0}", level, code="worker." + level)
+
+
+def pid() -> int:
+    return os.getpid()
+
+
+class RecordSink(event.Sink):
+
+    def __init__(self) -> None:
+        super(RecordSink, self).__init__()
+        self.events = []
+
+    def emit(self, evt: event.Event) -> None:
+        self.events.append(evt)
+
+
+class ProcessPoolTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.engine = engine.Engine("test", "test", "pytoolcore")
+        self.sink = RecordSink()
+        self.engine.sink = self.sink
+        self.engine.addcmd(command.Command("big", nbpositionals=1), big, "big result", processpool=True)
+        self.engine.addcmd(command.Command("fail", nbpositionals=1), fail, "raise", processpool=True)
+        self.engine.addcmd(command.Command("pid"), pid, "worker pid", processpool=True)
+
+    def tearDown(self) -> None:
+        self.engine.shutdownpool()
+
+    @staticmethod
+    def shmblocks() -> set:
+        return set(glob.glob("/dev/shm/psm_*"))
+
+    def test_exception(self) -> None:
+        for level in (event.WARNING, event.FAILURE):
+            self.assertTrue(self.engine("fail " + level))
+            evt = self.sink.events[-1]
+            self.assertEqual((evt.level, evt.code, evt.message),
+                             (level, "worker." + level, "worker " + level))
+
+    @unittest.skipUnless(os.path.isdir("/dev/shm"), "needs /dev/shm")
+    def test_shared_memory(self) -> None:
+        before = self.shmblocks()
+        res = self.engine("big {0}".format(engine.SHMTHRESHOLD + 1))
+        self.assertEqual(res, b"\xab" * (engine.SHMTHRESHOLD + 1))
+        self.assertEqual(self.engine("big 10"), b"\xab" * 10)
+        self.assertEqual(self.shmblocks() - before, set())
+
+    @unittest.skipUnless(os.path.isdir("/dev/shm"), "needs /dev/shm")
+    def test_shared_memory_released_without_caller(self) -> None:
+        # the result is never asked for, the done-callback still frees the block
+        before = self.shmblocks()
+        pool, future = self.engine.__poolsubmit__(big, [str(engine.SHMTHRESHOLD)], {})
+        future.exception()
+        time.sleep(0.1)
+        self.assertEqual(self.shmblocks() - before, set())
+
+    def test_unpicklable(self) -> None:
+        with self.assertRaises(exception.ErrorException):
+            self.engine.addcmd(command.Command("lambda"), lambda: None, "not picklable", processpool=True)
+        self.assertRaises(KeyError, self.engine.getcmd, "lambda")
+
+    def test_worker_killed_between_calls(self) -> None:
+        os.kill(self.engine("pid"), signal.SIGKILL)
+        time.sleep(0.5)
+        self.assertIsInstance(self.engine("pid"), int)
+        self.assertIsInstance(self.engine("pid"), int)
+
+
+if __name__ == "__main__":
+    unittest.main()
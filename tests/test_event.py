@@ -0,0 +1,96 @@
+import io
+import json
+import unittest
+from unittest import mock
+
+from pytoolcore import event
+from pytoolcore import exception
+from pytoolcore import style
+
+
+EXCEPTIONS = {
+    event.ERROR: (exception.ErrorException, style.Style.error),
+    event.FAILURE: (exception.FailureException, style.Style.failure),
+    event.WARNING: (exception.WarningException, style.Style.warning),
+    event.INFO: (exception.InfoException, style.Style.info),
+    event.SUCCESS: (exception.SuccessException, style.Style.success),
+}
+
+
+class Unformattable:
+
+    def __format__(self, spec: str) -> str:
+        raise AssertionError("formatted eagerly")
+
+
+class EventTest(unittest.TestCase):
+
+    def test_lazy_message(self) -> None:
+        evt = event.Event(event.INFO, "test.lazy", "value {0}", Unformattable())
+        event.NullSink().emit(evt)
+        with self.assertRaises(AssertionError):
+            evt.message
+
+    def test_table_not_rendered(self) -> None:
+        evt = event.Event(event.TABLE, "test.table", "", ["Name"], [["row"]])
+        with mock.patch.object(style.Style, "tabulate", return_value="table") as tabulate:
+            event.NullSink().emit(evt)
+            event.JsonLinesSink(io.StringIO()).emit(evt)
+            tabulate.assert_not_called()
+            self.assertEqual(evt.message, "table\n")
+            tabulate.assert_called_once_with(["Name"], [["row"]])
+
+    def test_sink_is_abstract(self) -> None:
+        self.assertRaises(TypeError, event.Sink)
+
+
+class SinkTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.stream = io.StringIO()
+
+    def test_jsonlines(self) -> None:
+        sink = event.JsonLinesSink(self.stream)
+        sink.emit(event.Event(event.ERROR, "option.notfound", "Option {0} isn't defined.", "foo"))
+        sink.emit(event.Event(event.TABLE, "show.name", "", ["Name"], [["n"]]))
+        sink.emit(event.Event(event.INFO, "test.object", "{0}", KeyError("key")))
+        records = [json.loads(line) for line in self.stream.getvalue().splitlines()]
+        self.assertEqual(records[0], {"level": event.ERROR, "code": "option.notfound",
+                                      "template": "Option {0} isn't defined.", "args": ["foo"],
+                                      "message": "Option foo isn't defined."})
+        self.assertEqual(records[1], {"level": event.TABLE, "code": "show.name", "template": "",
+                                      "args": [["Name"], [["n"]]]})
+        self.assertEqual(records[2]["args"], ["'key'"])
+
+    def test_plain(self) -> None:
+        sink = event.PlainSink(self.stream)
+        for level in EXCEPTIONS:
+            sink.emit(event.Event(level, "test.plain", "message"))
+        self.assertEqual(self.stream.getvalue().splitlines(),
+                         ["(!) Error: message", "[-] Failure: message", "/!\\ Warning: message",
+                          "(i) Information: message", "[+] Success: message"])
+        self.assertNotIn("\033", self.stream.getvalue())
+
+    def test_ansi(self) -> None:
+        event.AnsiSink(self.stream).emit(event.Event(event.SUCCESS, "test.ansi", "{0} done", 3))
+        self.assertEqual(self.stream.getvalue(), style.Style.success("3 done") + "\n")
+
+
+class EventExceptionTest(unittest.TestCase):
+
+    def test_levels(self) -> None:
+        for level, (cls, styler) in EXCEPTIONS.items():
+            err = cls("Option {0} set at {1}", "foo", 2, code="test.code")
+            self.assertEqual((err.event.level, err.event.code, err.event.template, err.event.args),
+                             (level, "test.code", "Option {0} set at {1}", ("foo", 2)))
+            self.assertEqual(err.message, "Option foo set at 2")
+            self.assertEqual(str(err), styler("Option foo set at 2"))
+
+    def test_defaults(self) -> None:
+        err = exception.ErrorException("no {placeholder} without args")
+        self.assertEqual(err.code, event.ERROR)
+        self.assertEqual(str(err), style.Style.error("no {placeholder} without args"))
+
+
+if __name__ == "__main__":
+    unittest.main()
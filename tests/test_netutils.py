@@ -0,0 +1,65 @@
+import random
+import ipaddress
+import unittest
+
+from pytoolcore import netutils
+
+
+class AddressSetTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.networks = ["10.0.0.0/24", "10.0.0.128/25", "10.0.1.0/24", "10.0.3.0/30",
+                         "192.168.1.7", "fe80::/64", "fe80::1:0:0:0/80", "2001:db8::/127"]
+        self.scope = netutils.AddressSet(self.networks)
+
+    def brutecontains(self, ipaddr: str) -> bool:
+        try:
+            addr = ipaddress.ip_address(ipaddr.split("%")[0])
+        except ValueError:
+            return False
+        return any(addr in ipaddress.ip_network(net) for net in self.networks)
+
+    def test_merge(self) -> None:
+        self.assertEqual(self.scope.networks(),
+                         ["10.0.0.0/23", "10.0.3.0/30", "192.168.1.7/32", "2001:db8::/127", "fe80::/64"])
+        self.assertEqual(len(self.scope), 5)
+
+    def test_contains(self) -> None:
+        rand = random.Random(0)
+        addrs = ["10.0.{0}.{1}".format(rand.randint(0, 4), rand.randint(0, 255)) for _ in range(500)]
+        addrs += ["fe80::{0:x}".format(rand.randint(0, 0xffff)) for _ in range(100)]
+        addrs += ["fe80::1%eth0", "2001:db8::1", "2001:db8::2", "192.168.1.7", "192.168.1.8",
+                  "not-an-address", "10.0.0.0/24"]
+        expected = [self.brutecontains(addr) for addr in addrs]
+        self.assertEqual([self.scope.contains(addr) for addr in addrs], expected)
+        self.assertEqual(self.scope.containsmany(addrs), expected)
+        self.assertEqual(self.scope.filter(addrs), [addr for addr, ok in zip(addrs, expected) if ok])
+        self.assertTrue("10.0.1.255" in self.scope)
+
+    def test_longestprefix(self) -> None:
+        self.assertEqual(self.scope.longestprefix("10.0.0.200"), "10.0.0.128/25")
+        self.assertEqual(self.scope.longestprefix("10.0.0.1"), "10.0.0.0/24")
+        self.assertEqual(self.scope.longestprefix("192.168.1.7"), "192.168.1.7/32")
+        self.assertEqual(self.scope.longestprefix("fe80::1:0:0:1"), "fe80::1:0:0:0/80")
+        self.assertEqual(self.scope.longestprefix("fe80::1"), "fe80::/64")
+        self.assertIsNone(self.scope.longestprefix("10.0.2.1"))
+        self.assertIsNone(self.scope.longestprefix("garbage"))
+
+    def test_scoped_hosts(self) -> None:
+        for netaddr in ("10.0.0.0/22", "10.0.3.0/31", "10.0.3.1/32", "192.168.1.0/24",
+                        "2001:db8::/126", "2001:db8::/127", "2001:db8::1/128", "fe80::/120"):
+            expected = [host for host in netutils.gethostsfromnetwork(netaddr)
+                        if self.brutecontains(host)]
+            self.assertEqual(netutils.gethostsfromnetwork(netaddr, self.scope), expected, netaddr)
+        self.assertEqual(netutils.gethostsfromnetwork("10.0.0.0/23", self.scope),
+                         netutils.gethostsfromnetwork("10.0.0.0/23"))
+
+    def test_isaddrinscope(self) -> None:
+        self.assertTrue(netutils.isaddrinscope("10.0.0.5", self.scope))
+        self.assertTrue(netutils.isaddrinscope("fe80::1%eth0", self.scope))
+        self.assertFalse(netutils.isaddrinscope("10.0.2.5", self.scope))
+        self.assertFalse(netutils.isaddrinscope("10.0.0.0/24", self.scope))
+
+
+if __name__ == "__main__":
+    unittest.main()
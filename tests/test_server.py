@@ -0,0 +1,178 @@
+import os
+import time
+import asyncio
+import tempfile
+import threading
+import unittest
+
+from pytoolcore import command
+from pytoolcore import engine
+from pytoolcore import event
+from pytoolcore import exception
+from pytoolcore import server
+
+
+def hello(name: str) -> bool:
+    print("hello", name)
+    return True
+
+
+def sleep(duration: str) -> bool:
+    time.sleep(float(duration))
+    return True
+
+
+def pooled(name: str) -> bool:
+    print("pooled", name)
+    if name == "fail":
+        raise exception.FailureException("pooled {0} failed", name, code="pooled.fail")
+    return True
+
+
+class RecordSink(event.Sink):
+
+    def __init__(self) -> None:
+        super(RecordSink, self).__init__()
+        self.events = []
+
+    def emit(self, evt: event.Event) -> None:
+        self.events.append(evt)
+
+
+class OptionLayerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.defaults = {"foo": engine.Option("foo", "default", "desc")}
+        self.layer = engine.OptionLayer(self.defaults)
+
+    def test_read_through(self) -> None:
+        self.assertEqual(self.layer["foo"].value, "default")
+        self.assertEqual(list(self.layer.items())[0][1].value, "default")
+        self.defaults["foo"].value = "changed"
+        self.assertEqual(self.layer["foo"].value, "changed")
+
+    def test_copy_on_assign(self) -> None:
+        self.layer.assign("foo", "mine")
+        self.assertEqual(self.layer["foo"].value, "mine")
+        self.assertEqual(self.defaults["foo"].value, "default")
+
+    def test_remove_and_add(self) -> None:
+        del self.layer["foo"]
+        self.assertNotIn("foo", self.layer)
+        self.assertIn("foo", self.defaults)
+        self.layer["bar"] = engine.Option("bar", "", "")
+        self.assertEqual(list(self.layer), ["bar"])
+        self.assertNotIn("bar", self.defaults)
+
+
+class ServerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.engine = engine.Engine("test", "test", "pytoolcore")
+        self.engine.addoption("foo", "test option", "default")
+        self.engine.addcmd(command.Command("hello", nbpositionals=1), hello, "say hello")
+        self.engine.addcmd(command.Command("sleep", nbpositionals=1), sleep, "sleep")
+        self.engine.addcmd(command.Command("pooled", nbpositionals=1), pooled, "print from a worker",
+                           processpool=True)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "engine.sock")
+        self.server = server.EngineServer(self.engine, path=self.path)
+        self.loop = asyncio.new_event_loop()
+        self.loop.run_until_complete(self.server.start())
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.clients = []
+
+    def tearDown(self) -> None:
+        for client in self.clients:
+            client.close()
+        asyncio.run_coroutine_threadsafe(self.server.shutdown(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+        self.engine.shutdownpool()
+        self.tmpdir.cleanup()
+
+    def connect(self) -> server.Client:
+        client = server.Client(path=self.path)
+        self.clients.append(client)
+        return client
+
+    def test_round_trip(self) -> None:
+        client = self.connect()
+        events = client("set foo bar")
+        self.assertEqual([(evt.level, evt.code, evt.message) for evt in events],
+                         [(event.SUCCESS, "option.set", "Option foo set at bar")])
+        self.assertEqual([evt.code for evt in client("nope")], ["command.notfound"])
+        self.assertEqual("".join(evt.message for evt in client("hello world")
+                                 if evt.code == server.STDOUT), "hello world\n")
+        table = client("show foo")[0]
+        self.assertEqual(table.level, event.TABLE)
+        self.assertIn("bar", table.message)
+
+    def test_session_isolation(self) -> None:
+        first = self.connect()
+        second = self.connect()
+        first("set foo mine")
+        self.assertIn("default", second("show foo")[0].message)
+        self.assertEqual(self.engine.getoptionvalue("foo"), "default")
+        # second only read its options, it still follows the shared defaults
+        self.engine.setvar("foo", "shared", verbose=False)
+        self.assertIn("shared", second("show foo")[0].message)
+        self.assertIn("mine", first("show foo")[0].message)
+
+    def test_slow_handler_does_not_block(self) -> None:
+        first = self.connect()
+        second = self.connect()
+        thread = threading.Thread(target=first, args=("sleep 0.5",))
+        thread.start()
+        time.sleep(0.05)
+        start = time.perf_counter()
+        second("show foo")
+        self.assertLess(time.perf_counter() - start, 0.3)
+        thread.join()
+
+    def test_pooled_output(self) -> None:
+        client = self.connect()
+        self.assertEqual([(evt.code, evt.message) for evt in client("pooled world")],
+                         [(server.STDOUT, "pooled world\n")])
+        self.assertEqual([(evt.code, evt.message) for evt in client("pooled fail")],
+                         [(server.STDOUT, "pooled fail\n"), ("pooled.fail", "pooled fail failed")])
+
+    def test_local_commands(self) -> None:
+        client = self.connect()
+        self.assertEqual([evt.code for evt in client("clear")], [server.CLEAR])
+        self.assertEqual(client("exit"), [])
+        self.assertTrue(client.closed)
+
+
+class TcpServerTest(unittest.TestCase):
+
+    def test_address(self) -> None:
+        eng = engine.Engine("test", "test", "pytoolcore")
+        sink = RecordSink()
+        eng.sink = sink
+        self.assertEqual(server.EngineServer(eng).__port__, server.DEFAULTPORT)
+        srv = server.EngineServer(eng, port=0)
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(srv.start(), loop).result()
+            asyncio.run_coroutine_threadsafe(srv.serve(), loop)
+            host, port = srv.address
+            self.assertNotEqual(port, 0)
+            client = server.Client(host=host, port=port)
+            self.assertEqual(client("show name")[0].message, "test's name")
+            client.close()
+            listening = [evt for evt in sink.events if evt.code == "server.listening"]
+            self.assertEqual(listening[0].message, "test listening on {0}".format((host, port)))
+        finally:
+            asyncio.run_coroutine_threadsafe(srv.shutdown(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+
+
+if __name__ == "__main__":
+    unittest.main()